@@ -16,6 +16,7 @@ class StartupCheck:
 
     MIN_MAJOR, MAX_MAJOR = 8, 8
     MIN_MINOR = 0
+    VIDEO_SHARDS = "0123456789abcdefghijklmnopqrstuvwxyz-_"
 
     def __init__(self):
         self.config_handler = ArchivistConfig()
@@ -62,6 +63,8 @@ class StartupCheck:
             "import",
             "backup",
         ]
+        # video thumbnails are sharded by first char of youtube_id
+        folders.extend([f"videos/{i}" for i in self.VIDEO_SHARDS])
         cache_dir = self.config_handler.config["application"]["cache_dir"]
         for folder in folders:
             folder_path = os.path.join(cache_dir, folder)
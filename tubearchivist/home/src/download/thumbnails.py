@@ -6,15 +6,20 @@ functionality:
 
 import base64
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from io import BytesIO
-from time import sleep
+from queue import Queue
+from threading import Thread
 
 import requests
-from home.src.download import queue  # partial import
 from home.src.es.connect import IndexPaginate
 from home.src.ta.config import AppConfig
 from mutagen.mp4 import MP4, MP4Cover
 from PIL import Image, ImageFile, ImageFilter, UnidentifiedImageError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
@@ -28,6 +33,24 @@ class ThumbManagerBase:
     CHANNEL_DIR = os.path.join(CACHE_DIR, "channels")
     PLAYLIST_DIR = os.path.join(CACHE_DIR, "playlists")
 
+    SESSION = requests.Session()
+    SESSION.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]
+            ),
+        ),
+    )
+    FALLBACK_CACHE = {}
+    DRAFT_SIZE = {
+        "video": (640, 360),
+        "icon": (400, 400),
+        "banner": (1280, 212),
+    }
+
     def __init__(self, item_id, item_type, fallback=False):
         self.item_id = item_id
         self.item_type = item_type
@@ -38,25 +61,42 @@ class ThumbManagerBase:
         if not url:
             return self.get_fallback()
 
-        for i in range(3):
+        try:
+            response = self.SESSION.get(url, timeout=5)
+        except requests.exceptions.RequestException:
+            print(f"{self.item_id}: failed thumbnail download {url}")
+            return False
+
+        if response.ok:
             try:
-                response = requests.get(url, stream=True, timeout=5)
-                if response.ok:
-                    try:
-                        return Image.open(response.raw)
-                    except UnidentifiedImageError:
-                        print(f"failed to open thumbnail: {url}")
-                        return self.get_fallback()
+                img_raw = self._open_verified(response.content)
+            except (UnidentifiedImageError, OSError, SyntaxError):
+                print(f"failed to open thumbnail: {url}")
+                return self.get_fallback()
 
-                if response.status_code == 404:
-                    return self.get_fallback()
+            return img_raw
 
-            except requests.exceptions.RequestException:
-                print(f"{self.item_id}: retry thumbnail download {url}")
-                sleep((i + 1) ** i)
+        if response.status_code == 404:
+            return self.get_fallback()
 
         return False
 
+    def _open_verified(self, img_data):
+        """verify image structure before decoding, raise if broken"""
+        Image.open(BytesIO(img_data)).verify()
+        img_raw = Image.open(BytesIO(img_data))
+        if img_raw.format == "JPEG":
+            if not img_data.rstrip(b"\x00").endswith(b"\xff\xd9"):
+                # missing end of image marker, body is truncated
+                raise OSError("truncated jpeg")
+
+        if self.item_type in self.DRAFT_SIZE:
+            # scale down large jpegs while decoding
+            img_raw.draft("RGB", self.DRAFT_SIZE[self.item_type])
+
+        img_raw.load()
+        return img_raw
+
     def get_fallback(self):
         """get fallback thumbnail if not available"""
         if self.fallback:
@@ -79,9 +119,27 @@ class ThumbManagerBase:
             ),
         }
 
-        img_raw = Image.open(default_map[self.item_type])
+        if self.item_type not in self.FALLBACK_CACHE:
+            img_raw = Image.open(default_map[self.item_type])
+            self.FALLBACK_CACHE[self.item_type] = img_raw.convert("RGB")
 
-        return img_raw
+        # return copy to keep cached image untouched by crop and save
+        return self.FALLBACK_CACHE[self.item_type].copy()
+
+    @staticmethod
+    def _save_jpeg(img_raw, thumb_path):
+        """save image as progressive jpeg tuned for web delivery"""
+        if img_raw.mode != "RGB":
+            img_raw = img_raw.convert("RGB")
+
+        img_raw.save(
+            thumb_path,
+            format="JPEG",
+            quality=85,
+            optimize=True,
+            progressive=True,
+            subsampling="4:2:0",
+        )
 
 
 class ThumbManager(ThumbManagerBase):
@@ -112,33 +170,55 @@ class ThumbManager(ThumbManagerBase):
 
     def download_video_thumb(self, url, skip_existing=False):
         """pass url for video thumbnail"""
-        folder_path = os.path.join(self.VIDEO_DIR, self.item_id[0].lower())
         thumb_path = self.vid_thumb_path(absolute=True)
 
         if skip_existing and os.path.exists(thumb_path):
             return
 
-        os.makedirs(folder_path, exist_ok=True)
+        img_raw = self.get_video_thumb(url)
+        self.save_video_thumb(img_raw)
+
+    def get_video_thumb(self, url):
+        """download video thumbnail and crop to 16:9"""
         img_raw = self.download_raw(url)
-        width, height = img_raw.size
+        crop_box = self._get_crop_box(*img_raw.size)
+        if crop_box:
+            img_raw = img_raw.crop(crop_box)
 
-        if not width / height == 16 / 9:
-            new_height = width / 16 * 9
-            offset = (height - new_height) / 2
-            img_raw = img_raw.crop((0, offset, width, height - offset))
+        return img_raw
 
-        img_raw.convert("RGB").save(thumb_path)
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _get_crop_box(width, height):
+        """get 16:9 crop box for size, False if already 16:9
+        thumbnails come in a handful of sizes, compute once per size
+        """
+        if width * 9 == height * 16:
+            return False
+
+        new_height = width * 9 // 16
+        offset = (height - new_height) // 2
+        return (0, offset, width, offset + new_height)
+
+    def save_video_thumb(self, img_raw):
+        """save processed video thumbnail to cache"""
+        thumb_path = self.vid_thumb_path(absolute=True)
+        try:
+            self._save_jpeg(img_raw, thumb_path)
+        except FileNotFoundError:
+            # shard folders get created at startup, recreate if removed
+            thumb_path = self.vid_thumb_path(absolute=True, create_folder=True)
+            self._save_jpeg(img_raw, thumb_path)
 
     def vid_thumb_path(self, absolute=False, create_folder=False):
         """build expected path for video thumbnail from youtube_id"""
         folder_name = self.item_id[0].lower()
-        folder_path = os.path.join("videos", folder_name)
-        thumb_path = os.path.join(folder_path, f"{self.item_id}.jpg")
+        thumb_path = f"videos/{folder_name}/{self.item_id}.jpg"
         if absolute:
-            thumb_path = os.path.join(self.CACHE_DIR, thumb_path)
+            thumb_path = f"{self.CACHE_DIR}/{thumb_path}"
 
         if create_folder:
-            folder_path = os.path.join(self.CACHE_DIR, folder_path)
+            folder_path = f"{self.VIDEO_DIR}/{folder_name}"
             os.makedirs(folder_path, exist_ok=True)
 
         return thumb_path
@@ -152,50 +232,47 @@ class ThumbManager(ThumbManagerBase):
     def _download_channel_thumb(self, channel_thumb, skip_existing):
         """download channel thumbnail"""
 
-        thumb_path = os.path.join(
-            self.CHANNEL_DIR, f"{self.item_id}_thumb.jpg"
-        )
+        thumb_path = f"{self.CHANNEL_DIR}/{self.item_id}_thumb.jpg"
         self.item_type = "icon"
 
         if skip_existing and os.path.exists(thumb_path):
             return
 
         img_raw = self.download_raw(channel_thumb)
-        img_raw.convert("RGB").save(thumb_path)
+        self._save_jpeg(img_raw, thumb_path)
 
     def _download_channel_banner(self, channel_banner, skip_existing):
         """download channel banner"""
 
-        banner_path = os.path.join(
-            self.CHANNEL_DIR, self.item_id + "_banner.jpg"
-        )
+        banner_path = f"{self.CHANNEL_DIR}/{self.item_id}_banner.jpg"
         self.item_type = "banner"
         if skip_existing and os.path.exists(banner_path):
             return
 
         img_raw = self.download_raw(channel_banner)
-        img_raw.convert("RGB").save(banner_path)
+        self._save_jpeg(img_raw, banner_path)
 
     def download_playlist_thumb(self, url, skip_existing=False):
         """pass thumbnail url"""
-        thumb_path = os.path.join(self.PLAYLIST_DIR, f"{self.item_id}.jpg")
+        thumb_path = f"{self.PLAYLIST_DIR}/{self.item_id}.jpg"
         if skip_existing and os.path.exists(thumb_path):
             return
 
         img_raw = self.download_raw(url)
-        img_raw.convert("RGB").save(thumb_path)
+        self._save_jpeg(img_raw, thumb_path)
 
     def delete_video_thumb(self):
         """delete video thumbnail if exists"""
-        thumb_path = self.vid_thumb_path()
-        to_delete = os.path.join(self.CACHE_DIR, thumb_path)
+        to_delete = self.vid_thumb_path(absolute=True)
         if os.path.exists(to_delete):
             os.remove(to_delete)
+        if os.path.exists(f"{to_delete}.blur"):
+            os.remove(f"{to_delete}.blur")
 
     def delete_channel_thumb(self):
         """delete all artwork of channel"""
-        thumb = os.path.join(self.CHANNEL_DIR, f"{self.item_id}_thumb.jpg")
-        banner = os.path.join(self.CHANNEL_DIR, f"{self.item_id}_banner.jpg")
+        thumb = f"{self.CHANNEL_DIR}/{self.item_id}_thumb.jpg"
+        banner = f"{self.CHANNEL_DIR}/{self.item_id}_banner.jpg"
         if os.path.exists(thumb):
             os.remove(thumb)
         if os.path.exists(banner):
@@ -203,20 +280,47 @@ class ThumbManager(ThumbManagerBase):
 
     def delete_playlist_thumb(self):
         """delete playlist thumbnail"""
-        thumb_path = os.path.join(self.PLAYLIST_DIR, f"{self.item_id}.jpg")
+        thumb_path = f"{self.PLAYLIST_DIR}/{self.item_id}.jpg"
         if os.path.exists(thumb_path):
             os.remove(thumb_path)
 
     def get_vid_base64_blur(self):
-        """return base64 encoded placeholder"""
-        file_path = os.path.join(self.CACHE_DIR, self.vid_thumb_path())
+        """return base64 encoded placeholder, cached next to thumbnail"""
+        file_path = self.vid_thumb_path(absolute=True)
+        cache_path = f"{file_path}.blur"
+        if os.path.exists(cache_path):
+            thumb_mtime = os.stat(file_path).st_mtime_ns
+            if os.stat(cache_path).st_mtime_ns >= thumb_mtime:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return f.read()
+
+        data_url = self._build_base64_blur(file_path)
+        # unique temp file per writer, replace is atomic for readers
+        tmp_fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(cache_path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
+                f.write(data_url)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+        return data_url
+
+    @staticmethod
+    def _build_base64_blur(file_path):
+        """build blurred base64 data url from thumbnail"""
         img_raw = Image.open(file_path)
-        img_raw.thumbnail((img_raw.width // 20, img_raw.height // 20))
+        target_size = (img_raw.width // 20, img_raw.height // 20)
+        # let the jpeg decoder scale down, thumbnail covers the rest
+        img_raw.draft("RGB", target_size)
+        img_raw.thumbnail(target_size)
         img_blur = img_raw.filter(ImageFilter.BLUR)
         buffer = BytesIO()
-        img_blur.save(buffer, format="JPEG")
-        img_data = buffer.getvalue()
-        img_base64 = base64.b64encode(img_data).decode()
+        img_blur.save(buffer, format="JPEG", quality=70, optimize=True)
+        img_base64 = base64.b64encode(buffer.getbuffer()).decode("ascii")
         data_url = f"data:image/jpg;base64,{img_base64}"
 
         return data_url
@@ -225,6 +329,9 @@ class ThumbManager(ThumbManagerBase):
 class ValidatorCallback:
     """handle callback validate thumbnails page by page"""
 
+    MAX_WORKERS = 16
+    QUEUE_SIZE = 64
+
     def __init__(self, source, index_name):
         self.source = source
         self.index_name = index_name
@@ -241,27 +348,118 @@ class ValidatorCallback:
 
     def _validate_videos(self):
         """check if video thumbnails are correct"""
+        folders = {i["_source"]["youtube_id"][0].lower() for i in self.source}
+        existing = {
+            folder: self._get_existing(f"{ThumbManager.VIDEO_DIR}/{folder}")
+            for folder in folders
+        }
+
+        to_download = []
         for video in self.source:
-            url = video["_source"]["vid_thumb_url"]
-            handler = ThumbManager(video["_source"]["youtube_id"])
-            handler.download_video_thumb(url, skip_existing=True)
+            youtube_id = video["_source"]["youtube_id"]
+            if f"{youtube_id}.jpg" in existing[youtube_id[0].lower()]:
+                continue
+
+            handler = ThumbManager(youtube_id)
+            to_download.append((handler, video["_source"]["vid_thumb_url"]))
+
+        if not to_download:
+            return
+
+        # overlap network wait of downloads with jpeg encoding of saves
+        to_save = Queue(maxsize=self.QUEUE_SIZE)
+        savers = [
+            Thread(target=self._save_worker, args=(to_save,))
+            for _ in range(os.cpu_count())
+        ]
+        for saver in savers:
+            saver.start()
+
+        try:
+            self._download_parallel(
+                lambda item: to_save.put(
+                    (item[0], item[0].get_video_thumb(item[1]))
+                ),
+                to_download,
+            )
+        finally:
+            for _ in savers:
+                to_save.put(None)
+            for saver in savers:
+                saver.join()
+
+    @staticmethod
+    def _save_worker(to_save):
+        """save downloaded video thumbnails until stopped"""
+        # pylint: disable=broad-except
+        while True:
+            item = to_save.get()
+            if item is None:
+                break
+
+            handler, img_raw = item
+            try:
+                handler.save_video_thumb(img_raw)
+            except Exception as err:
+                # keep draining, a dead saver blocks the producers on put
+                print(f"{handler.item_id}: failed to save thumbnail {err}")
 
     def _validate_channels(self):
         """check if all channel artwork is there"""
+        existing = self._get_existing(ThumbManager.CHANNEL_DIR)
+        to_download = []
         for channel in self.source:
+            channel_id = channel["_source"]["channel_id"]
+            thumb = f"{channel_id}_thumb.jpg"
+            banner = f"{channel_id}_banner.jpg"
+            if thumb in existing and banner in existing:
+                continue
+
             urls = (
                 channel["_source"]["channel_thumb_url"],
                 channel["_source"]["channel_banner_url"],
             )
-            handler = ThumbManager(channel["_source"]["channel_id"])
-            handler.download_channel_art(urls, skip_existing=True)
+            to_download.append((ThumbManager(channel_id), urls))
+
+        self._download_parallel(
+            lambda item: item[0].download_channel_art(
+                item[1], skip_existing=True
+            ),
+            to_download,
+        )
 
     def _validate_playlists(self):
         """check if all playlist artwork is there"""
+        existing = self._get_existing(ThumbManager.PLAYLIST_DIR)
+        to_download = []
         for playlist in self.source:
+            playlist_id = playlist["_source"]["playlist_id"]
+            if f"{playlist_id}.jpg" in existing:
+                continue
+
             url = playlist["_source"]["playlist_thumbnail"]
-            handler = ThumbManager(playlist["_source"]["playlist_id"])
-            handler.download_playlist_thumb(url, skip_existing=True)
+            to_download.append((ThumbManager(playlist_id), url))
+
+        self._download_parallel(
+            lambda item: item[0].download_playlist_thumb(item[1]), to_download
+        )
+
+    @staticmethod
+    def _get_existing(folder_path):
+        """get set of all file names in folder with a single scan"""
+        try:
+            with os.scandir(folder_path) as all_files:
+                return {i.name for i in all_files}
+        except FileNotFoundError:
+            return set()
+
+    def _download_parallel(self, download, to_download):
+        """run download for every item, overlapping network wait"""
+        if not to_download:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            list(executor.map(download, to_download))
 
 
 class ThumbValidator:
@@ -319,6 +517,7 @@ class ThumbFilesystem:
     CACHE_DIR = CONFIG["application"]["cache_dir"]
     MEDIA_DIR = CONFIG["application"]["videos"]
     VIDEO_DIR = os.path.join(CACHE_DIR, "videos")
+    COVER_PADDING = 128 * 1024
 
     def sync(self):
         """embed thumbnails to mediafiles"""
@@ -327,17 +526,18 @@ class ThumbFilesystem:
 
     def get_thumb_list(self):
         """get list of mediafiles and matching thumbnails"""
-        pending = queue.PendingList()
-        pending.get_download()
-        pending.get_indexed()
+        data = {
+            "query": {"match_all": {}},
+            "sort": [{"youtube_id": {"order": "asc"}}],
+            "_source": ["youtube_id", "media_url"],
+        }
+        all_videos = IndexPaginate("ta_video", data, size=5000).get_results()
 
         video_list = []
-        for video in pending.all_videos:
+        for video in all_videos:
             video_id = video["youtube_id"]
-            media_url = os.path.join(self.MEDIA_DIR, video["media_url"])
-            thumb_path = os.path.join(
-                self.CACHE_DIR, ThumbManager(video_id).vid_thumb_path()
-            )
+            media_url = f"{self.MEDIA_DIR}/{video['media_url']}"
+            thumb_path = ThumbManager(video_id).vid_thumb_path(absolute=True)
             video_list.append(
                 {
                     "media_url": media_url,
@@ -347,22 +547,37 @@ class ThumbFilesystem:
 
         return video_list
 
-    @staticmethod
-    def _embed_thumbs(video_list):
-        """rewrite the thumbnail into media file"""
-
-        counter = 1
-        for video in video_list:
-            # loop through all videos
-            media_url = video["media_url"]
-            thumb_path = video["thumb_path"]
-
-            mutagen_vid = MP4(media_url)
-            with open(thumb_path, "rb") as f:
-                mutagen_vid["covr"] = [
-                    MP4Cover(f.read(), imageformat=MP4Cover.FORMAT_JPEG)
-                ]
-            mutagen_vid.save()
-            if counter % 50 == 0:
-                print(f"thumbnail write progress {counter}/{len(video_list)}")
-            counter = counter + 1
+    def _embed_thumbs(self, video_list):
+        """rewrite the thumbnails into media files in parallel"""
+        total = len(video_list)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            to_embed = [
+                executor.submit(self._embed_thumb, i) for i in video_list
+            ]
+            for counter, future in enumerate(as_completed(to_embed), 1):
+                future.result()
+                if counter % 50 == 0:
+                    print(f"thumbnail write progress {counter}/{total}")
+
+    def _embed_thumb(self, video):
+        """rewrite the thumbnail into a single media file"""
+        mutagen_vid = MP4(video["media_url"])
+        with open(video["thumb_path"], "rb") as f:
+            thumb_data = f.read()
+
+        existing = mutagen_vid.get("covr")
+        if existing and existing[0] == thumb_data:
+            # identical cover already embedded
+            return
+
+        mutagen_vid["covr"] = [
+            MP4Cover(thumb_data, imageformat=MP4Cover.FORMAT_JPEG)
+        ]
+        mutagen_vid.save(padding=self._cover_padding)
+
+    def _cover_padding(self, info):
+        """keep padding if new cover fits, else reserve room for next"""
+        if info.padding >= 0:
+            return info.padding
+
+        return self.COVER_PADDING
@@ -10,6 +10,7 @@ from http import cookiejar
 from io import StringIO
 
 import yt_dlp
+from home.src.ta.config import get_config_cached
 from home.src.ta.ta_redis import RedisArchivist
 
 
@@ -102,6 +103,7 @@ class CookieHandler:
         RedisArchivist().set_message("cookie", cookie)
         path = ".downloads.cookie_import"
         RedisArchivist().set_message("config", True, path=path)
+        get_config_cached.cache_clear()
         self.config["downloads"]["cookie_import"] = True
         print("cookie: activated and stored in Redis")
 
@@ -113,6 +115,7 @@ class CookieHandler:
         RedisArchivist().set_message(
             "config", False, path=".downloads.cookie_import"
         )
+        get_config_cached.cache_clear()
         print("cookie: revoked")
 
     def validate(self):
@@ -8,6 +8,7 @@ import json
 
 import requests
 from home.src.ta.config import AppConfig
+from requests.adapters import HTTPAdapter
 
 
 class ElasticWrap:
@@ -15,6 +16,11 @@ class ElasticWrap:
     returns response json and status code tuple
     """
 
+    ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    SESSION = requests.Session()
+    SESSION.mount("http://", ADAPTER)
+    SESSION.mount("https://", ADAPTER)
+
     def __init__(self, path, config=False):
         self.url = False
         self.auth = False
@@ -24,19 +30,22 @@ class ElasticWrap:
 
     def _get_config(self):
         """add config if not passed"""
-        if not self.config:
-            self.config = AppConfig().config
+        if self.config:
+            application = self.config["application"]
+        else:
+            # connection details only come from env, skip reading redis
+            application = AppConfig.get_config_env()
 
-        es_url = self.config["application"]["es_url"]
-        self.auth = self.config["application"]["es_auth"]
+        es_url = application["es_url"]
+        self.auth = application["es_auth"]
         self.url = f"{es_url}/{self.path}"
 
     def get(self, data=False):
         """get data from es"""
         if data:
-            response = requests.get(self.url, json=data, auth=self.auth)
+            response = self.SESSION.get(self.url, json=data, auth=self.auth)
         else:
-            response = requests.get(self.url, auth=self.auth)
+            response = self.SESSION.get(self.url, auth=self.auth)
         if not response.ok:
             print(response.text)
 
@@ -52,11 +61,13 @@ class ElasticWrap:
             payload = json.dumps(data)
 
         if data:
-            response = requests.post(
+            response = self.SESSION.post(
                 self.url, data=payload, headers=headers, auth=self.auth
             )
         else:
-            response = requests.post(self.url, headers=headers, auth=self.auth)
+            response = self.SESSION.post(
+                self.url, headers=headers, auth=self.auth
+            )
 
         if not response.ok:
             print(response.text)
@@ -67,7 +78,7 @@ class ElasticWrap:
         """put data to es"""
         if refresh:
             self.url = f"{self.url}/?refresh=true"
-        response = requests.put(f"{self.url}", json=data, auth=self.auth)
+        response = self.SESSION.put(f"{self.url}", json=data, auth=self.auth)
         if not response.ok:
             print(response.text)
             print(data)
@@ -80,9 +91,9 @@ class ElasticWrap:
         if refresh:
             self.url = f"{self.url}/?refresh=true"
         if data:
-            response = requests.delete(self.url, json=data, auth=self.auth)
+            response = self.SESSION.delete(self.url, json=data, auth=self.auth)
         else:
-            response = requests.delete(self.url, auth=self.auth)
+            response = self.SESSION.delete(self.url, auth=self.auth)
 
         if not response.ok:
             print(response.text)
@@ -4,11 +4,14 @@ Functionality:
 - called via user input
 """
 
+import logging
+
 from home.src.download.queue import PendingInteract
 from home.src.download.subscriptions import (
     ChannelSubscription,
     PlaylistSubscription,
 )
+from home.src.frontend.searching import SearchHandler
 from home.src.frontend.watched import WatchState
 from home.src.index.channel import YoutubeChannel
 from home.src.index.playlist import YoutubePlaylist
@@ -29,6 +32,8 @@ from home.tasks import (
     update_subscribed,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class PostData:
     """
@@ -36,9 +41,39 @@ class PostData:
     handover long running tasks to celery
     """
 
+    EXEC_MAP = {
+        "watched": "_watched",
+        "un_watched": "_un_watched",
+        "change_view": "_change_view",
+        "change_grid": "_change_grid",
+        "rescan_pending": "_rescan_pending",
+        "ignore": "_ignore",
+        "dl_pending": "_dl_pending",
+        "queue": "_queue_handler",
+        "unsubscribe": "_unsubscribe",
+        "subscribe": "_subscribe",
+        "sort_order": "_sort_order",
+        "hide_watched": "_hide_watched",
+        "show_subed_only": "_show_subed_only",
+        "dlnow": "_dlnow",
+        "show_ignored_only": "_show_ignored_only",
+        "forgetIgnore": "_forget_ignore",
+        "addSingle": "_add_single",
+        "deleteQueue": "_delete_queue",
+        "manual-import": "_manual_import",
+        "re-embed": "_re_embed",
+        "db-backup": "_db_backup",
+        "db-restore": "_db_restore",
+        "fs-rescan": "_fs_rescan",
+        "delete-video": "_delete_video",
+        "delete-channel": "_delete_channel",
+        "delete-playlist": "_delete_playlist",
+        "find-playlists": "_find_playlists",
+    }
+
     def __init__(self, post_dict, current_user):
         self.post_dict = post_dict
-        self.to_exec, self.exec_val = list(post_dict.items())[0]
+        self.to_exec, self.exec_val = next(iter(post_dict.items()))
         self.current_user = current_user
 
     def run_task(self):
@@ -49,37 +84,7 @@ class PostData:
 
     def exec_map(self):
         """map dict key and return function to execute"""
-        exec_map = {
-            "watched": self._watched,
-            "un_watched": self._un_watched,
-            "change_view": self._change_view,
-            "change_grid": self._change_grid,
-            "rescan_pending": self._rescan_pending,
-            "ignore": self._ignore,
-            "dl_pending": self._dl_pending,
-            "queue": self._queue_handler,
-            "unsubscribe": self._unsubscribe,
-            "subscribe": self._subscribe,
-            "sort_order": self._sort_order,
-            "hide_watched": self._hide_watched,
-            "show_subed_only": self._show_subed_only,
-            "dlnow": self._dlnow,
-            "show_ignored_only": self._show_ignored_only,
-            "forgetIgnore": self._forget_ignore,
-            "addSingle": self._add_single,
-            "deleteQueue": self._delete_queue,
-            "manual-import": self._manual_import,
-            "re-embed": self._re_embed,
-            "db-backup": self._db_backup,
-            "db-restore": self._db_restore,
-            "fs-rescan": self._fs_rescan,
-            "delete-video": self._delete_video,
-            "delete-channel": self._delete_channel,
-            "delete-playlist": self._delete_playlist,
-            "find-playlists": self._find_playlists,
-        }
-
-        return exec_map[self.to_exec]
+        return getattr(self, self.EXEC_MAP[self.to_exec])
 
     def _watched(self):
         """mark as watched"""
@@ -95,7 +100,7 @@ class PostData:
         """process view changes in home, channel, and downloads"""
         origin, new_view = self.exec_val.split(":")
         key = f"{self.current_user}:view:{origin}"
-        print(f"change view: {key} to {new_view}")
+        logger.debug("change view: %s to %s", key, new_view)
         RedisArchivist().set_message(key, {"status": new_view})
         return {"success": True}
 
@@ -106,21 +111,21 @@ class PostData:
         grid_items = min(grid_items, 7)
 
         key = f"{self.current_user}:grid_items"
-        print(f"change grid items: {grid_items}")
+        logger.debug("change grid items: %s", grid_items)
         RedisArchivist().set_message(key, {"status": grid_items})
         return {"success": True}
 
     @staticmethod
     def _rescan_pending():
         """look for new items in subscribed channels"""
-        print("rescan subscribed channels")
+        logger.debug("rescan subscribed channels")
         update_subscribed.delay()
         return {"success": True}
 
     def _ignore(self):
         """ignore from download queue"""
         video_id = self.exec_val
-        print(f"{video_id}: ignore video from download queue")
+        logger.debug("%s: ignore video from download queue", video_id)
         PendingInteract(video_id=video_id, status="ignore").update_status()
         # also clear from redis queue
         RedisQueue().clear_item(video_id)
@@ -129,10 +134,10 @@ class PostData:
     @staticmethod
     def _dl_pending():
         """start the download queue"""
-        print("download pending")
+        logger.debug("download pending")
         running = download_pending.delay()
         task_id = running.id
-        print(f"{task_id}: set task id")
+        logger.debug("%s: set task id", task_id)
         RedisArchivist().set_message("dl_queue_id", task_id)
         return {"success": True}
 
@@ -140,14 +145,14 @@ class PostData:
         """queue controls from frontend"""
         to_execute = self.exec_val
         if to_execute == "stop":
-            print("stopping download queue")
+            logger.debug("stopping download queue")
             RedisQueue().clear()
         elif to_execute == "kill":
             task_id = RedisArchivist().get_message("dl_queue_id")
             if not isinstance(task_id, str):
                 task_id = False
             else:
-                print("brutally killing " + task_id)
+                logger.debug("brutally killing %s", task_id)
             kill_dl(task_id)
 
         return {"success": True}
@@ -155,7 +160,7 @@ class PostData:
     def _unsubscribe(self):
         """unsubscribe from channels or playlists"""
         id_unsub = self.exec_val
-        print(f"{id_unsub}: unsubscribe")
+        logger.debug("%s: unsubscribe", id_unsub)
         to_unsub_list = UrlListParser(id_unsub).process_list()
         for to_unsub in to_unsub_list:
             unsub_type = to_unsub["type"]
@@ -176,28 +181,47 @@ class PostData:
     def _subscribe(self):
         """subscribe to channel or playlist, called from js buttons"""
         id_sub = self.exec_val
-        print(f"{id_sub}: subscribe")
+        logger.debug("%s: subscribe", id_sub)
         subscribe_to.delay(id_sub)
         return {"success": True}
 
     def _sort_order(self):
-        """change the sort between published to downloaded"""
-        sort_order = {"status": self.exec_val}
-        if self.exec_val in ["asc", "desc"]:
-            RedisArchivist().set_message(
-                f"{self.current_user}:sort_order", sort_order
-            )
+        """change sort by and sort order, single value or dict of both"""
+        if isinstance(self.exec_val, dict):
+            sort_config = self.exec_val
+        elif self.exec_val in ["asc", "desc"]:
+            sort_config = {"sort_order": self.exec_val}
         else:
-            RedisArchivist().set_message(
-                f"{self.current_user}:sort_by", sort_order
-            )
+            sort_config = {"sort_by": self.exec_val}
+
+        if not self._valid_sort(sort_config):
+            logger.warning("invalid sort config: %s", sort_config)
+            return {"success": False}
+
+        messages = {
+            f"{self.current_user}:{key}": {"status": value}
+            for key, value in sort_config.items()
+        }
+        RedisArchivist().set_messages(messages)
         return {"success": True}
 
+    @staticmethod
+    def _valid_sort(sort_config):
+        """only store values the list views can sort by"""
+        valid = {
+            "sort_by": SearchHandler.SORT_BY_MAP,
+            "sort_order": ["asc", "desc"],
+        }
+        return bool(sort_config) and all(
+            key in valid and isinstance(value, str) and value in valid[key]
+            for key, value in sort_config.items()
+        )
+
     def _hide_watched(self):
         """toggle if to show watched vids or not"""
         key = f"{self.current_user}:hide_watched"
         message = {"status": bool(int(self.exec_val))}
-        print(f"toggle {key}: {message}")
+        logger.debug("toggle %s: %s", key, message)
         RedisArchivist().set_message(key, message)
         return {"success": True}
 
@@ -205,17 +229,17 @@ class PostData:
         """show or hide subscribed channels only on channels page"""
         key = f"{self.current_user}:show_subed_only"
         message = {"status": bool(int(self.exec_val))}
-        print(f"toggle {key}: {message}")
+        logger.debug("toggle %s: %s", key, message)
         RedisArchivist().set_message(key, message)
         return {"success": True}
 
     def _dlnow(self):
         """start downloading single vid now"""
         youtube_id = self.exec_val
-        print(f"{youtube_id}: downloading now")
+        logger.debug("%s: downloading now", youtube_id)
         running = download_single.delay(youtube_id=youtube_id)
         task_id = running.id
-        print("set task id: " + task_id)
+        logger.debug("set task id: %s", task_id)
         RedisArchivist().set_message("dl_queue_id", task_id)
         return {"success": True}
 
@@ -224,55 +248,55 @@ class PostData:
         show_value = self.exec_val
         key = f"{self.current_user}:show_ignored_only"
         value = {"status": show_value}
-        print(f"Filter download view ignored only: {show_value}")
+        logger.debug("Filter download view ignored only: %s", show_value)
         RedisArchivist().set_message(key, value)
         return {"success": True}
 
     def _forget_ignore(self):
         """delete from ta_download index"""
         video_id = self.exec_val
-        print(f"{video_id}: forget from download")
+        logger.debug("%s: forget from download", video_id)
         PendingInteract(video_id=video_id).delete_item()
         return {"success": True}
 
     def _add_single(self):
         """add single youtube_id to download queue"""
         video_id = self.exec_val
-        print(f"{video_id}: add single vid to download queue")
+        logger.debug("%s: add single vid to download queue", video_id)
         PendingInteract(video_id=video_id, status="pending").update_status()
         return {"success": True}
 
     def _delete_queue(self):
         """delete download queue"""
         status = self.exec_val
-        print("deleting from download queue: " + status)
+        logger.debug("deleting from download queue: %s", status)
         PendingInteract(status=status).delete_by_status()
         return {"success": True}
 
     @staticmethod
     def _manual_import():
         """run manual import from settings page"""
-        print("starting manual import")
+        logger.debug("starting manual import")
         run_manual_import.delay()
         return {"success": True}
 
     @staticmethod
     def _re_embed():
         """rewrite thumbnails into media files"""
-        print("start video thumbnail embed process")
+        logger.debug("start video thumbnail embed process")
         re_sync_thumbs.delay()
         return {"success": True}
 
     @staticmethod
     def _db_backup():
         """backup es to zip from settings page"""
-        print("backing up database")
+        logger.debug("backing up database")
         run_backup.delay("manual")
         return {"success": True}
 
     def _db_restore(self):
         """restore es zip from settings page"""
-        print("restoring index from backup zip")
+        logger.debug("restoring index from backup zip")
         filename = self.exec_val
         run_restore_backup.delay(filename)
         return {"success": True}
@@ -280,7 +304,7 @@ class PostData:
     @staticmethod
     def _fs_rescan():
         """start file system rescan task"""
-        print("start filesystem scan")
+        logger.debug("start filesystem scan")
         rescan_filesystem.delay()
         return {"success": True}
 
@@ -301,7 +325,7 @@ class PostData:
         playlist_dict = self.exec_val
         playlist_id = playlist_dict["playlist-id"]
         playlist_action = playlist_dict["playlist-action"]
-        print(f"{playlist_id}: delete playlist {playlist_action}")
+        logger.debug("%s: delete playlist %s", playlist_id, playlist_action)
         if playlist_action == "metadata":
             YoutubePlaylist(playlist_id).delete_metadata()
         elif playlist_action == "all":
@@ -17,6 +17,14 @@ from home.src.ta.config import AppConfig
 class SearchHandler:
     """search elastic search"""
 
+    # frontend sort by value to es field
+    SORT_BY_MAP = {
+        "views": "stats.view_count",
+        "likes": "stats.like_count",
+        "downloaded": "date_downloaded",
+        "published": "published",
+    }
+
     def __init__(self, path, config, data=False):
         self.max_hits = None
         self.path = path
@@ -26,7 +34,10 @@ class SearchHandler:
     def get_data(self):
         """get the data"""
         response, _ = ElasticWrap(self.path, config=self.config).get(self.data)
+        return self.process(response)
 
+    def process(self, response):
+        """process es response, clean up hits and cache artwork links"""
         if "hits" in response.keys():
             self.max_hits = response["hits"]["total"]["value"]
             return_value = response["hits"]["hits"]
@@ -7,6 +7,8 @@ Functionality:
 import json
 import os
 import re
+from copy import deepcopy
+from functools import lru_cache
 
 from celery.schedules import crontab
 from home.src.ta.ta_redis import RedisArchivist
@@ -15,16 +17,20 @@ from home.src.ta.ta_redis import RedisArchivist
 class AppConfig:
     """handle user settings and application variables"""
 
-    def __init__(self, user_id=False):
+    def __init__(self, user_id=False, cached=False):
         self.user_id = user_id
+        self.cached = cached
         self.config = self.get_config()
         self.colors = self.get_colors()
 
     def get_config(self):
         """get config from default file or redis if changed"""
-        config = self.get_config_redis()
-        if not config:
-            config = self.get_config_file()
+        if self.cached:
+            config = deepcopy(get_config_cached())
+        else:
+            config = self.get_config_redis()
+            if not config:
+                config = self.get_config_file()
 
         if self.user_id:
             key = f"{self.user_id}:page_size"
@@ -100,6 +106,7 @@ class AppConfig:
             updated.append((config_value, to_write))
 
         RedisArchivist().set_message("config", self.config)
+        get_config_cached.cache_clear()
         return updated
 
     @staticmethod
@@ -135,6 +142,7 @@ class AppConfig:
         if not redis_config:
             config = self.get_config()
             RedisArchivist().set_message("config", config)
+            get_config_cached.cache_clear()
             return
 
         needs_update = False
@@ -154,6 +162,15 @@ class AppConfig:
 
         if needs_update:
             RedisArchivist().set_message("config", redis_config)
+            get_config_cached.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def get_config_cached():
+    """read config once per process for the web views
+    clear with get_config_cached.cache_clear() after writing config
+    """
+    return AppConfig().config
 
 
 class ScheduleBuilder:
@@ -197,6 +214,7 @@ class ScheduleBuilder:
             if key in self.CONFIG and value:
                 redis_config["scheduler"][key] = int(value)
         RedisArchivist().set_message("config", redis_config)
+        get_config_cached.cache_clear()
         mess_dict = {
             "status": self.MSG,
             "level": "info",
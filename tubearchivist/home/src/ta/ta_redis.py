@@ -47,6 +47,16 @@ class RedisArchivist(RedisBase):
                 secs = expire
             self.conn.execute_command("EXPIRE", self.NAME_SPACE + key, secs)
 
+    def set_messages(self, messages):
+        """write multiple messages to redis in one round trip"""
+        pipeline = self.conn.pipeline(transaction=False)
+        for key, message in messages.items():
+            pipeline.execute_command(
+                "JSON.SET", self.NAME_SPACE + key, ".", json.dumps(message)
+            )
+
+        pipeline.execute()
+
     def get_message(self, key):
         """get message dict from redis"""
         reply = self.conn.execute_command("JSON.GET", self.NAME_SPACE + key)
@@ -57,6 +67,22 @@ class RedisArchivist(RedisBase):
 
         return json_str
 
+    def get_messages(self, keys):
+        """get dict of multiple messages with a single redis call"""
+        if not keys:
+            return {}
+
+        to_get = [self.NAME_SPACE + key for key in keys]
+        reply = self.conn.execute_command("JSON.MGET", *to_get, ".")
+        messages = {}
+        for key, json_str in zip(keys, reply):
+            if json_str:
+                messages[key] = json.loads(json_str)
+            else:
+                messages[key] = {"status": False}
+
+        return messages
+
     def list_items(self, query):
         """list all matches"""
         reply = self.conn.execute_command(
@@ -88,15 +114,9 @@ class RedisArchivist(RedisBase):
 
     def get_progress(self):
         """get a list of all progress messages"""
-        all_messages = []
-        for channel in self.CHANNELS:
-            key = "message:" + channel
-            reply = self.conn.execute_command(
-                "JSON.GET", self.NAME_SPACE + key
-            )
-            if reply:
-                json_str = json.loads(reply)
-                all_messages.append(json_str)
+        keys = [f"{self.NAME_SPACE}message:{i}" for i in self.CHANNELS]
+        reply = self.conn.execute_command("JSON.MGET", *keys, ".")
+        all_messages = [json.loads(i) for i in reply if i]
 
         return all_messages
 
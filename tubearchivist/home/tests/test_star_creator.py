@@ -0,0 +1,47 @@
+"""test rating to stars conversion"""
+
+from django.test import SimpleTestCase
+from home.views import VideoView
+
+
+def star_loop(rating):
+    """reference implementation, convert rating float to stars in a loop"""
+    if not rating:
+        return False
+
+    stars = []
+    for _ in range(1, 6):
+        if rating >= 0.75:
+            stars.append("full")
+        elif 0.25 < rating < 0.75:
+            stars.append("half")
+        else:
+            stars.append("empty")
+        rating = rating - 1
+    return stars
+
+
+class StarCreatorTests(SimpleTestCase):
+    """compare lookup table with reference loop"""
+
+    def test_boundaries(self):
+        """check values on and next to every .25 and .75 boundary"""
+        ratings = [None, 0, 0.0, -1, 5, 5.5, 6]
+        for whole in range(-1, 7):
+            for boundary in (whole + 0.25, whole + 0.75):
+                ratings.extend([boundary, boundary - 1e-9, boundary + 1e-9])
+
+        for rating in ratings:
+            with self.subTest(rating=rating):
+                self.assertEqual(
+                    VideoView.star_creator(rating), star_loop(rating)
+                )
+
+    def test_grid(self):
+        """check evenly spaced ratings over the full range"""
+        for step in range(-100, 600):
+            rating = step / 100
+            with self.subTest(rating=rating):
+                self.assertEqual(
+                    VideoView.star_creator(rating), star_loop(rating)
+                )
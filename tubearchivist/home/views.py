@@ -4,16 +4,21 @@ Functionality:
 - holds base classes to inherit from
 """
 
+import hashlib
 import json
+import logging
+import math
 import urllib.parse
-from time import sleep
 
 from api.src.search_processor import SearchProcess
 from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.forms import AuthenticationForm
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
 from django.views import View
 from home.src.download.yt_dlp_base import CookieHandler
 from home.src.es.connect import ElasticWrap
@@ -41,10 +46,25 @@ from home.src.ta.ta_redis import RedisArchivist
 from home.tasks import extrac_dl, index_channel_playlists, subscribe_to
 from rest_framework.authtoken.models import Token
 
+logger = logging.getLogger(__name__)
+
 
 class ArchivistViewConfig(View):
     """base view class to generate initial config context"""
 
+    USER_KEYS = [
+        "sort_by",
+        "sort_order",
+        "grid_items",
+        "hide_watched",
+        "show_ignored_only",
+        "show_subed_only",
+        "view:home",
+        "view:channel",
+        "view:playlist",
+        "view:downloads",
+    ]
+
     def __init__(self, view_origin):
         super().__init__()
         self.view_origin = view_origin
@@ -53,10 +73,19 @@ class ArchivistViewConfig(View):
         self.default_conf = False
         self.context = False
 
+    def _get_user_conf(self):
+        """get all user config values from redis in a single call"""
+        keys = [f"{self.user_id}:{i}" for i in self.USER_KEYS]
+        messages = RedisArchivist().get_messages(keys)
+        user_conf = {
+            i: messages[key]["status"] for i, key in zip(self.USER_KEYS, keys)
+        }
+
+        return user_conf
+
     def _get_sort_by(self):
         """return sort_by config var"""
-        messag_key = f"{self.user_id}:sort_by"
-        sort_by = self.user_conf.get_message(messag_key)["status"]
+        sort_by = self.user_conf["sort_by"]
         if not sort_by:
             sort_by = self.default_conf["archive"]["sort_by"]
 
@@ -64,8 +93,7 @@ class ArchivistViewConfig(View):
 
     def _get_sort_order(self):
         """return sort_order config var"""
-        sort_order_key = f"{self.user_id}:sort_order"
-        sort_order = self.user_conf.get_message(sort_order_key)["status"]
+        sort_order = self.user_conf["sort_order"]
         if not sort_order:
             sort_order = self.default_conf["archive"]["sort_order"]
 
@@ -73,8 +101,7 @@ class ArchivistViewConfig(View):
 
     def _get_view_style(self):
         """return view_style config var"""
-        view_key = f"{self.user_id}:view:{self.view_origin}"
-        view_style = self.user_conf.get_message(view_key)["status"]
+        view_style = self.user_conf[f"view:{self.view_origin}"]
         if not view_style:
             view_style = self.default_conf["default_view"][self.view_origin]
 
@@ -82,8 +109,7 @@ class ArchivistViewConfig(View):
 
     def _get_grid_items(self):
         """return items per row to show in grid view"""
-        grid_key = f"{self.user_id}:grid_items"
-        grid_items = self.user_conf.get_message(grid_key)["status"]
+        grid_items = self.user_conf["grid_items"]
         if not grid_items:
             grid_items = self.default_conf["default_view"]["grid_items"]
 
@@ -94,8 +120,7 @@ class ArchivistViewConfig(View):
         all_keys = ["channel", "playlist", "home"]
         all_styles = {}
         for view_origin in all_keys:
-            view_key = f"{self.user_id}:view:{view_origin}"
-            view_style = self.user_conf.get_message(view_key)["status"]
+            view_style = self.user_conf[f"view:{view_origin}"]
             if not view_style:
                 view_style = self.default_conf["default_view"][view_origin]
             all_styles[view_origin] = view_style
@@ -103,28 +128,19 @@ class ArchivistViewConfig(View):
         return all_styles
 
     def _get_hide_watched(self):
-        hide_watched_key = f"{self.user_id}:hide_watched"
-        hide_watched = self.user_conf.get_message(hide_watched_key)["status"]
-
-        return hide_watched
+        return self.user_conf["hide_watched"]
 
     def _get_show_ignore_only(self):
-        ignored_key = f"{self.user_id}:show_ignored_only"
-        show_ignored_only = self.user_conf.get_message(ignored_key)["status"]
-
-        return show_ignored_only
+        return self.user_conf["show_ignored_only"]
 
     def _get_show_subed_only(self):
-        sub_only_key = f"{self.user_id}:show_subed_only"
-        show_subed_only = self.user_conf.get_message(sub_only_key)["status"]
-
-        return show_subed_only
+        return self.user_conf["show_subed_only"]
 
     def config_builder(self, user_id):
         """build default context for every view"""
         self.user_id = user_id
-        self.user_conf = RedisArchivist()
-        self.default_conf = AppConfig(self.user_id).config
+        self.user_conf = self._get_user_conf()
+        self.default_conf = AppConfig(self.user_id, cached=True).config
 
         self.context = {
             "colors": self.default_conf["application"]["colors"],
@@ -145,6 +161,7 @@ class ArchivistResultsView(ArchivistViewConfig):
 
     view_origin = False
     es_search = False
+    es_source = False
 
     def __init__(self):
         super().__init__(self.view_origin)
@@ -155,15 +172,7 @@ class ArchivistResultsView(ArchivistViewConfig):
 
     def _sort_by_overwrite(self):
         """overwrite sort by key to match with es keys"""
-        sort_by_map = {
-            "views": "stats.view_count",
-            "likes": "stats.like_count",
-            "downloaded": "date_downloaded",
-            "published": "published",
-        }
-        sort_by = sort_by_map[self.context["sort_by"]]
-
-        return sort_by
+        return SearchHandler.SORT_BY_MAP[self.context["sort_by"]]
 
     @staticmethod
     def _url_encode(search_get):
@@ -184,6 +193,9 @@ class ArchivistResultsView(ArchivistViewConfig):
             "query": {"match_all": {}},
             "sort": [{self.sort_by: {"order": sort_order}}],
         }
+        if self.es_source:
+            data["_source"] = self.es_source
+
         self.data = data
 
     def match_progress(self):
@@ -263,6 +275,14 @@ class HomeView(ArchivistResultsView):
 
     view_origin = "home"
     es_search = "ta_video/_search"
+    es_source = [
+        "youtube_id",
+        "title",
+        "published",
+        "vid_thumb_url",
+        "player",
+        "channel",
+    ]
 
     def get(self, request):
         """handle get requests"""
@@ -308,7 +328,7 @@ class LoginView(View):
     def get(request):
         """handle get requests"""
         failed = bool(request.GET.get("failed"))
-        colors = AppConfig(request.user.id).colors
+        colors = AppConfig(request.user.id, cached=True).colors
         form = CustomAuthForm()
         context = {"colors": colors, "form": form, "form_error": failed}
         return render(request, "home/login.html", context)
@@ -322,7 +342,9 @@ class LoginView(View):
                 request.session.set_expiry(self.SEC_IN_DAY * 365)
             else:
                 request.session.set_expiry(self.SEC_IN_DAY * 2)
-            print(f"expire session in {request.session.get_expiry_age()} secs")
+            logger.debug(
+                "expire session in %s secs", request.session.get_expiry_age()
+            )
 
             next_url = request.POST.get("next") or "home"
             user = form.get_user()
@@ -337,15 +359,23 @@ class AboutView(View):
     show helpful how to information
     """
 
-    @staticmethod
-    def get(request):
-        """handle http get"""
-        context = {
-            "title": "About",
-            "colors": AppConfig(request.user.id).colors,
-            "version": settings.TA_VERSION,
-        }
-        return render(request, "home/about.html", context)
+    CACHE_TIMEOUT = 3600
+
+    def get(self, request):
+        """handle http get, page only changes with colors and version"""
+        colors = AppConfig(request.user.id, cached=True).colors
+        cache_key = f"about:{settings.TA_VERSION}:{colors}"
+        content = cache.get(cache_key)
+        if not content:
+            context = {
+                "title": "About",
+                "colors": colors,
+                "version": settings.TA_VERSION,
+            }
+            content = render_to_string("home/about.html", context, request)
+            cache.set(cache_key, content, self.CACHE_TIMEOUT)
+
+        return HttpResponse(content)
 
 
 class DownloadView(ArchivistResultsView):
@@ -355,6 +385,16 @@ class DownloadView(ArchivistResultsView):
 
     view_origin = "downloads"
     es_search = "ta_download/_search"
+    es_source = [
+        "youtube_id",
+        "title",
+        "published",
+        "duration",
+        "vid_thumb_url",
+        "channel_id",
+        "channel_name",
+        "channel_indexed",
+    ]
 
     def get(self, request):
         """handle get request"""
@@ -439,13 +479,13 @@ class DownloadView(ArchivistResultsView):
         to_queue = AddToQueueForm(data=request.POST)
         if to_queue.is_valid():
             url_str = request.POST.get("vid_url")
-            print(url_str)
+            logger.debug(url_str)
             try:
                 youtube_ids = UrlListParser(url_str).process_list()
             except ValueError:
                 # failed to process
                 key = "message:add"
-                print(f"failed to parse: {url_str}")
+                logger.warning("failed to parse: %s", url_str)
                 mess_dict = {
                     "status": key,
                     "level": "error",
@@ -455,10 +495,17 @@ class DownloadView(ArchivistResultsView):
                 RedisArchivist().set_message(key, mess_dict, expire=True)
                 return redirect("downloads")
 
-            print(youtube_ids)
+            logger.debug(youtube_ids)
+            key = "message:add"
+            mess_dict = {
+                "status": key,
+                "level": "info",
+                "title": "Adding to download queue.",
+                "message": "Queued for processing",
+            }
+            RedisArchivist().set_message(key, mess_dict, expire=True)
             extrac_dl.delay(youtube_ids)
 
-        sleep(2)
         return redirect("downloads", permanent=True)
 
 
@@ -499,23 +546,23 @@ class ChannelIdView(ChannelIdBaseView):
 
     view_origin = "home"
     es_search = "ta_video/_search"
+    es_source = HomeView.es_source
 
     def get(self, request, channel_id):
         """get request"""
         self.initiate_vars(request)
         self._update_view_data(channel_id)
-        self.find_results()
+        channel_hit = self._find_results_channel(channel_id)
         self.match_progress()
         self.channel_has_pending(channel_id)
 
         if self.context["results"]:
             channel_info = self.context["results"][0]["source"]["channel"]
-            channel_name = channel_info["channel_name"]
         else:
-            # fall back channel lookup if no videos found
-            es_path = f"ta_channel/_doc/{channel_id}"
-            channel_info = self.single_lookup(es_path)
-            channel_name = channel_info["channel_name"]
+            # fall back to channel document if no videos found
+            channel_info = channel_hit
+
+        channel_name = channel_info["channel_name"]
 
         self.context.update(
             {
@@ -526,6 +573,33 @@ class ChannelIdView(ChannelIdBaseView):
 
         return render(request, "home/channel_id.html", self.context)
 
+    def _find_results_channel(self, channel_id):
+        """find videos and channel document in a single msearch request,
+        return channel source for fallback if channel has no videos
+        """
+        to_search = [
+            {"index": "ta_video"},
+            self.data,
+            {"index": "ta_channel"},
+            {"query": {"ids": {"values": [channel_id]}}},
+        ]
+        query_str = "\n".join([json.dumps(i) for i in to_search]) + "\n"
+        response, _ = ElasticWrap("_msearch").post(data=query_str, ndjson=True)
+        video_response, channel_response = response["responses"]
+
+        search = SearchHandler(self.es_search, config=self.default_conf)
+        self.context["results"] = search.process(video_response)
+        self.pagination_handler.validate(search.max_hits)
+        self.context["max_hits"] = search.max_hits
+        self.context["pagination"] = self.pagination_handler.pagination
+
+        channel_search = SearchHandler("ta_channel/_search", config=False)
+        channel_hits = channel_search.process(channel_response)
+        if not channel_hits:
+            return False
+
+        return channel_hits[0]["source"]
+
     def _update_view_data(self, channel_id):
         """update view specific data dict"""
         self.data["query"] = {
@@ -544,16 +618,15 @@ class ChannelIdView(ChannelIdBaseView):
     @staticmethod
     def post(request, channel_id):
         """handle post request"""
-        print(f"handle post from {channel_id}")
+        logger.debug("handle post from %s", channel_id)
         channel_overwrite_form = ChannelOverwriteForm(request.POST)
         if channel_overwrite_form.is_valid():
             overwrites = channel_overwrite_form.cleaned_data
-            print(f"{channel_id}: set overwrites {overwrites}")
+            logger.debug("%s: set overwrites %s", channel_id, overwrites)
             channel_overwrites(channel_id, overwrites=overwrites)
             if overwrites.get("index_playlists") == "1":
                 index_channel_playlists.delay(channel_id)
 
-        sleep(1)
         return redirect("channel_id", channel_id, permanent=True)
 
 
@@ -588,16 +661,15 @@ class ChannelIdAboutView(ChannelIdBaseView):
     @staticmethod
     def post(request, channel_id):
         """handle post request"""
-        print(f"handle post from {channel_id}")
+        logger.debug("handle post from %s", channel_id)
         channel_overwrite_form = ChannelOverwriteForm(request.POST)
         if channel_overwrite_form.is_valid():
             overwrites = channel_overwrite_form.cleaned_data
-            print(f"{channel_id}: set overwrites {overwrites}")
+            logger.debug("%s: set overwrites %s", channel_id, overwrites)
             channel_overwrites(channel_id, overwrites=overwrites)
             if overwrites.get("index_playlists") == "1":
                 index_channel_playlists.delay(channel_id)
 
-        sleep(1)
         return redirect("channel_id_about", channel_id, permanent=True)
 
 
@@ -646,6 +718,15 @@ class ChannelView(ArchivistResultsView):
 
     view_origin = "channel"
     es_search = "ta_channel/_search"
+    es_source = [
+        "channel_id",
+        "channel_name",
+        "channel_subs",
+        "channel_subscribed",
+        "channel_last_refresh",
+        "channel_thumb_url",
+        "channel_banner_url",
+    ]
 
     def get(self, request):
         """handle get request"""
@@ -683,10 +764,9 @@ class ChannelView(ArchivistResultsView):
             }
             RedisArchivist().set_message(key, message=message, expire=True)
             url_str = request.POST.get("subscribe")
-            print(url_str)
+            logger.debug(url_str)
             subscribe_to.delay(url_str)
 
-        sleep(1)
         return redirect("channel", permanent=True)
 
 
@@ -821,7 +901,7 @@ class PlaylistView(ArchivistResultsView):
         subscribe_form = SubscribeToPlaylistForm(data=request.POST)
         if subscribe_form.is_valid():
             url_str = request.POST.get("subscribe")
-            print(url_str)
+            logger.debug(url_str)
             key = "message:subplaylist"
             message = {
                 "status": key,
@@ -832,7 +912,6 @@ class PlaylistView(ArchivistResultsView):
             RedisArchivist().set_message(key, message=message, expire=True)
             subscribe_to.delay(url_str)
 
-        sleep(1)
         return redirect("playlist")
 
 
@@ -841,9 +920,19 @@ class VideoView(View):
     display details about a single video
     """
 
+    # star list by count of full stars and half star
+    STARS = {
+        (full, half): ["full"] * full
+        + ["half"] * half
+        + ["empty"] * (5 - full - half)
+        for full in range(6)
+        for half in range(2)
+        if full + half <= 5
+    }
+
     def get(self, request, video_id):
         """get single video"""
-        config_handler = AppConfig(request.user.id)
+        config_handler = AppConfig(request.user.id, cached=True)
         position = time_parser(request.GET.get("t"))
         path = f"ta_video/_doc/{video_id}"
         look_up = SearchHandler(path, config=False)
@@ -893,16 +982,11 @@ class VideoView(View):
         if not rating:
             return False
 
-        stars = []
-        for _ in range(1, 6):
-            if rating >= 0.75:
-                stars.append("full")
-            elif 0.25 < rating < 0.75:
-                stars.append("half")
-            else:
-                stars.append("empty")
-            rating = rating - 1
-        return stars
+        # star n is full if rating - n >= 0.75, count those in closed form
+        full = min(max(math.floor(rating - 0.75) + 1, 0), 5)
+        # only the star after the last full one can be half
+        half = int(full < 5 and 0.25 < rating - full < 0.75)
+        return list(VideoView.STARS[(full, half)])
 
 
 class SearchView(ArchivistResultsView):
@@ -936,7 +1020,7 @@ class SettingsView(View):
 
     def get(self, request):
         """read and display current settings"""
-        config_handler = AppConfig(request.user.id)
+        config_handler = AppConfig(request.user.id, cached=True)
         colors = config_handler.colors
 
         available_backups = get_available_backups()
@@ -981,7 +1065,7 @@ class SettingsView(View):
         if app_form.is_valid():
             app_form_post = app_form.cleaned_data
             if app_form_post:
-                print(app_form_post)
+                logger.debug(app_form_post)
                 updated = config_handler.update_config(app_form_post)
                 self.post_process_updated(updated, config_handler.config)
 
@@ -989,10 +1073,9 @@ class SettingsView(View):
         if scheduler_form.is_valid():
             scheduler_form_post = scheduler_form.cleaned_data
             if any(scheduler_form_post.values()):
-                print(scheduler_form_post)
+                logger.debug(scheduler_form_post)
                 ScheduleBuilder().update_schedule_conf(scheduler_form_post)
 
-        sleep(1)
         return redirect("settings", permanent=True)
 
     def post_process_updated(self, updated, config):
@@ -1013,7 +1096,7 @@ class SettingsView(View):
             try:
                 handler.import_cookie()
             except FileNotFoundError:
-                print("cookie: import failed, file not found")
+                logger.warning("cookie: import failed, file not found")
                 handler.revoke()
                 self._fail_message("Cookie file not found.")
                 return
@@ -1044,8 +1127,16 @@ def progress(request):
     return list of messages for frontend
     """
     all_messages = RedisArchivist().get_progress()
-    json_data = {"messages": all_messages}
-    return JsonResponse(json_data)
+    json_bytes = json.dumps({"messages": all_messages}).encode()
+    etag = f'"{hashlib.blake2b(json_bytes, digest_size=8).hexdigest()}"'
+    response = get_conditional_response(request, etag=etag)
+    if not response:
+        response = HttpResponse(json_bytes, content_type="application/json")
+
+    # let the browser revalidate every poll, unchanged returns 304
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
 
 
 def process(request):
@@ -1054,7 +1145,7 @@ def process(request):
         current_user = request.user.id
         post_dict = json.loads(request.body.decode())
         if post_dict.get("reset-token"):
-            print("revoke API token")
+            logger.debug("revoke API token")
             request.user.auth_token.delete()
             return JsonResponse({"success": True})
 
@@ -2,8 +2,10 @@
 
 /* globals checkMessages */
 
-function sortChange(sortValue) {
-  let payload = JSON.stringify({ sort_order: sortValue });
+function sortChange() {
+  let sortBy = document.getElementById('sort').value;
+  let sortOrder = document.getElementById('sort-order').value;
+  let payload = JSON.stringify({ sort_order: { sort_by: sortBy, sort_order: sortOrder } });
   sendPost(payload);
   setTimeout(function () {
     location.reload();